@@ -4,21 +4,167 @@ Includes chat history, chat summary, popup removal, and all advanced features
 Optimized for containerized deployment on Render
 """
 import asyncio
-import json
-import csv
-from datetime import datetime
+import gzip
+from datetime import datetime, timedelta, timezone
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 import os
+from urllib.parse import urlsplit, urlunsplit
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import traceback
+import threading
+import time
+import sqlite3
+import random
 import google.generativeai as genai
+import orjson
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts up to capacity, then refill_per_sec"""
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Take tokens, sleeping only when the bucket is empty"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.refill_per_sec
+            time.sleep(wait)
+
+# Playwright + browser shared by every scraper run on the same event loop
+_BROWSER_SINGLETON = {'pw': None, 'browser': None, 'loop': None}
+
+def _backoff(attempt, base, cap=60):
+    """Exponential backoff delay with jitter for the given 1-based attempt"""
+    return min(cap, base * 2 ** (attempt - 1)) * (0.5 + random.random())
+
+def _retry_after(response, default):
+    """Seconds the server asked us to wait via Retry-After, else default"""
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, ValueError):
+        return default
+
+def _normalize_url(url):
+    """Canonical form of a profile URL for dedupe: lower-case scheme and host,
+    no trailing slash or fragment. The query is kept since it may identify the candidate."""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+def _csv_escape(value):
+    """Format a value as a CSV field, quoting only when needed"""
+    if value is None:
+        return ''
+    s = str(value)
+    if any(ch in s for ch in ',"\r\n'):
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
 class JobTodayWebhookScraper:
+    candidate_button_selector = 'button:has(img[alt$="\'s avatar"])'
+    chat_button_selector = 'button:has-text("Chat with")'
+    profile_pane_selector = 'div.col-span-1.overflow-y-auto:has(button:has-text("Chat with"))'
+    phone_container_selector = 'div.flex.items-center.gap-2.mt-2:has(img[src*="IconPhoneFilled28"])'
+    show_phone_selector = 'span.cursor-pointer.text-jt-blue-500:has-text("Show phone")'
+    user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    # Only DOM text is scraped, so these are never needed. Stylesheets stay
+    # allowed because visibility checks and clicks depend on layout.
+    blocked_resource_types = ('image', 'media', 'font')
+    blocked_hosts = (
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+        'intercom.io', 'intercomcdn.com', 'segment.com', 'segment.io',
+        'facebook.net', 'hotjar.com'
+    )
+    # Once a context's list is loaded, other third-party traffic is cut too;
+    # API calls still pass so profiles, phone reveal and chat keep working
+    first_party_host = 'jobtoday.com'
+    api_resource_types = ('xhr', 'fetch', 'eventsource')
+    
+    # Elements that only render once logged in, and the login form's email field
+    post_login_selector = ', '.join([
+        '[data-testid="tabs-my_jobs"]',
+        'a[href="/jobs"]',
+        'button:has-text("Post a job")',
+        '[data-testid="sidebar"]'
+    ])
+    email_selector = 'input[type="email"]'
+    
+    # Profile pane fields read directly by selector: (field, selector)
+    profile_fields = (
+        ('name', 'div.font-bold.text-2xl'),
+        ('email', 'a[href^="mailto:"]'),
+        ('location', 'div:has(img[src*="IconPinThinBlack20"]) > span'),
+        ('about', 'hr.my-6 + div.px-4.break-word'),
+    )
+    # Profile pane fields held in the div after a section header: (field, header text)
+    profile_sections = (
+        ('certificates', 'Certificates'),
+        ('experience', 'Experience'),
+        ('languages', 'Languages'),
+    )
+    profile_extract_js = """(el, [fields, sections]) => {
+        const text = node => (node && node.innerText) || 'N/A';
+        const result = {};
+        for (const [field, selector] of fields) result[field] = text(el.querySelector(selector));
+        const headers = [...el.querySelectorAll('div.font-bold.text-xl')];
+        for (const [field, title] of sections) {
+            const header = headers.find(h => h.innerText.toLowerCase().includes(title.toLowerCase()));
+            let block = header && header.nextElementSibling;
+            while (block && block.tagName !== 'DIV') block = block.nextElementSibling;
+            result[field] = text(block);
+        }
+        return result;
+    }"""
+    # Columns of the streamed CSV, one per key scrape_candidate_details fills in
+    csv_columns = (
+        'about', 'application_date', 'certificates', 'chat_history', 'chat_summary', 'email',
+        'experience', 'job_role', 'languages', 'location', 'name', 'phone', 'profile_url'
+    )
+    # Airtable column for each candidate key, plus the values every new record starts with
+    airtable_fields = (
+        ('Name', 'name'), ('Phone', 'phone'), ('Email', 'email'), ('Location', 'location'),
+        ('About', 'about'), ('Experience', 'experience'), ('Languages', 'languages'),
+        ('Certificates', 'certificates'), ('Profile URL', 'profile_url'),
+        ('Application Date', 'application_date'), ('Role', 'job_role'),
+        ('Chat History', 'chat_history'), ('Chat Summary', 'chat_summary')
+    )
+    airtable_defaults = {'Status': 'New', 'Notes': ''}
+    # Candidate count plus the name and "Applied on" line of the card at index i
+    candidate_preview_js = """(els, i) => {
+        const el = els[i];
+        const applied = el && [...el.querySelectorAll('p')]
+            .find(p => p.innerText.toLowerCase().includes('applied on'));
+        const name = el && el.querySelector('.font-bold');
+        return {
+            count: els.length,
+            name: name ? name.innerText : '',
+            applied: applied ? applied.innerText : null,
+        };
+    }"""
+    # True once the phone span shows the full number rather than "Show phone" or a masked one
+    phone_revealed_js = """el => {
+        const phone = el.textContent.replace('Show phone', '').trim();
+        return phone.length >= 9 && !phone.includes('…');
+    }"""
+
     def __init__(self):
         self.email = os.getenv('JOBTODAY_EMAIL')
         self.password = os.getenv('JOBTODAY_PASSWORD')
@@ -29,21 +175,85 @@ class JobTodayWebhookScraper:
         self.base_url = "https://web.jobtoday.com"
         self.candidates = []
         self.processed_names = set()
+        # Normalized profile URLs already in self.candidates
+        self._recorded_urls = set()
+        
+        # JSON-Lines checkpoint and CSV, appended by a writer task as candidates are scraped
+        self.checkpoint_file = 'candidates.jsonl'
+        self.csv_file = 'candidates_detailed.csv'
+        self._checkpoint = None
+        self._csv = None
+        self._write_queue = None
+        self._writer_task = None
+        # Details of candidates scraped in earlier runs, keyed by profile URL, so a
+        # restart skips the phone reveal and chat for profiles it has seen recently.
+        # Entries expire so chat history and summary get refreshed
+        self.scrape_cache_file = 'scraped.db'
+        self.scrape_cache_max_age = timedelta(hours=24)
+        self._scrape_cache = None
         self.playwright = None
         self.browser = None
+        self.context = None
+        self.page = None
         self.job_role = None
         
         # Retry tracking for candidates
         self.candidate_retry_attempts = {}
         
+        # Number of browser contexts scraping candidates in parallel
+        self.concurrency = int(os.getenv('SCRAPER_CONCURRENCY', '3'))
+        # Contexts whose candidate list is loaded (see _block_resources)
+        self._locked_contexts = set()
+        # Sections run concurrently: worker contexts are capped across all of
+        # them, and a candidate listed in two sections is only scraped once
+        self._context_slots = asyncio.Semaphore(self.concurrency)
+        self._login_lock = asyncio.Lock()
+        self._in_flight = set()
+        self._processed_count = 0
+        self._total_candidates = 0
+        
         # Airtable setup
         self.airtable_token = os.getenv('AIRTABLE_PAT')
         self.airtable_base_id = os.getenv('AIRTABLE_BASE_ID')
         self.airtable_table_name = os.getenv('AIRTABLE_TABLE_NAME', 'Candidates')
         self.airtable_api_url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_name}"
+        # Built once; kept off the shared session so the token never reaches n8n
+        self._airtable_headers = {'Authorization': f'Bearer {self.airtable_token}'}
+        # Compressed request bodies are opt-in, as for n8n, until confirmed to be accepted
+        self.airtable_accepts_gzip = os.getenv('AIRTABLE_ACCEPTS_GZIP', 'false').lower() == 'true'
+        self._airtable_post_headers = {**self._airtable_headers, 'Content-Type': 'application/json'}
+        if self.airtable_accepts_gzip:
+            self._airtable_post_headers['Content-Encoding'] = 'gzip'
+        # Airtable allows 5 requests per second per base
+        self._airtable_bucket = TokenBucket(capacity=5, refill_per_sec=5)
+        # Existing profile URLs, fetched in the background while scraping runs;
+        # the event tells that worker thread to stop paging once the run ends
+        self._existing_profiles_task = None
+        self._stop_profile_scan = threading.Event()
+        # Known URLs cached between runs so only newly created records are scanned;
+        # a full rescan past max age picks up records deleted in Airtable
+        self.url_cache_file = 'airtable_urls_cache.json'
+        self.url_cache_max_age = timedelta(hours=24)
+        
+        # Shared HTTP session so Airtable and webhook calls reuse keep-alive connections.
+        # Only GETs are retried here; creating records isn't idempotent, so
+        # Airtable POSTs retry explicitly in _post_airtable_batch
+        self.http = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods={'GET'})
+        self.http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retries))
         
         # n8n webhook
         self.n8n_webhook_url = os.getenv('N8N_WEBHOOK_URL')
+        if self.n8n_webhook_url:
+            # _post_webhook retries on its own, so the webhook host gets an adapter that
+            # doesn't also retry connection errors underneath it
+            parts = urlsplit(self.n8n_webhook_url)
+            self.http.mount(f"{parts.scheme}://{parts.netloc}/", HTTPAdapter(max_retries=0))
+        # Not every webhook receiver decompresses request bodies, so this is opt-in
+        self.n8n_accepts_gzip = os.getenv('N8N_ACCEPTS_GZIP', 'false').lower() == 'true'
+        # Background webhook posts, capped so a slow receiver can't pile them up
+        self._pending_webhooks = set()
+        self._webhook_slots = asyncio.Semaphore(8)
         
         # Google Gemini API setup
         self.gemini_api_key = os.getenv('GOOGLE_GEMINI')
@@ -76,14 +286,32 @@ class JobTodayWebhookScraper:
             logger.warning("Google Gemini not configured")
         
     async def initialize_browser(self, headless=True):
-        """Initialize browser with Render-compatible settings"""
+        """Initialize browser with Render-compatible settings, reusing a running one if possible"""
         try:
+            shared = _BROWSER_SINGLETON
+            loop = asyncio.get_running_loop()
+            if shared['browser'] and shared['loop'] is loop and shared['browser'].is_connected():
+                self.playwright = shared['pw']
+                self.browser = shared['browser']
+                logger.info("✓ Reusing running browser")
+                print("✓ Browser reused")
+                return True
+            if shared['pw'] and shared['loop'] is loop:
+                # The shared browser died; stop its driver before launching a fresh one
+                try:
+                    await shared['pw'].stop()
+                except Exception as e:
+                    logger.warning(f"Could not stop previous Playwright: {e}")
+                shared.update(pw=None, browser=None, loop=None)
+
             logger.info("Starting Playwright...")
             self.playwright = await async_playwright().start()
             
             logger.info("Launching Chromium browser...")
             
-            # Browser args for containerized environments
+            # Browser args for containerized environments. No --single-process/--no-zygote:
+            # several contexts are opened and closed in parallel on this browser, which
+            # single-process Chromium doesn't handle reliably
             browser_args = [
                 '--no-sandbox',
                 '--disable-setuid-sandbox',
@@ -91,9 +319,7 @@ class JobTodayWebhookScraper:
                 '--disable-accelerated-2d-canvas',
                 '--disable-gpu',
                 '--window-size=1920x1080',
-                '--single-process',
                 '--disable-dev-tools',
-                '--no-zygote',
                 '--disable-blink-features=AutomationControlled'
             ]
             
@@ -127,16 +353,7 @@ class JobTodayWebhookScraper:
                 
                 raise launch_error
             
-            logger.info("Creating browser context...")
-            self.context = await self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            
-            await self.context.grant_permissions(['geolocation'], origin=self.base_url)
-            
-            logger.info("Creating new page...")
-            self.page = await self.context.new_page()
+            shared.update(pw=self.playwright, browser=self.browser, loop=loop)
             
             logger.info("✓ Browser initialized successfully")
             print("✓ Browser initialized")
@@ -148,41 +365,50 @@ class JobTodayWebhookScraper:
             print(f"✗ Browser initialization failed: {e}")
             raise
         
+    async def new_context(self, storage_state=None):
+        """Create a browser context with the scraper's viewport, user agent and permissions"""
+        context = await self.browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=self.user_agent,
+            storage_state=storage_state
+        )
+        await context.grant_permissions(['geolocation'], origin=self.base_url)
+        await context.route("**/*", lambda route, request: self._block_resources(route, request, context))
+        return context
+
+    async def _block_resources(self, route, request, context):
+        """Abort images, fonts, media and third-party trackers, plus any other
+        non-API third-party request once the context's list is loaded"""
+        host = urlsplit(request.url).hostname or ''
+        if request.resource_type in self.blocked_resource_types or host.endswith(self.blocked_hosts):
+            await route.abort()
+        elif (context in self._locked_contexts
+              and host != self.first_party_host
+              and not host.endswith('.' + self.first_party_host)
+              and request.resource_type not in self.api_resource_types):
+            await route.abort()
+        else:
+            await route.continue_()
+        
+    async def _wait_for_app_or_login(self, timeout=20000):
+        """Wait for whichever renders first on self.page: the logged-in app shell
+        (True) or the login form (False). None if neither shows up in time."""
+        try:
+            element = await self.page.wait_for_selector(
+                f'{self.post_login_selector}, {self.email_selector}', timeout=timeout, state='visible'
+            )
+        except PlaywrightTimeout:
+            return None
+        return not await element.evaluate('(el, sel) => el.matches(sel)', self.email_selector)
+
     async def login(self):
         try:
             print("→ Navigating to JobToday to log in...")
             logger.info("Navigating to login page")
-            await self.page.goto(f"{self.base_url}/auth/login", wait_until='domcontentloaded', timeout=120000)
-            await asyncio.sleep(3)
-            
-            post_login_selectors = [
-                '[data-testid="tabs-my_jobs"]',
-                'a[href="/jobs"]',
-                'button:has-text("Post a job")',
-                '[data-testid="sidebar"]'
-            ]
+            await self.page.goto(f"{self.base_url}/auth/login", wait_until='commit', timeout=120000)
             
-            already_logged_in = False
-            for selector in post_login_selectors:
-                try:
-                    element = await self.page.wait_for_selector(selector, timeout=10000, state='attached')
-                    if element and await element.is_visible():
-                        print("✓ Already logged in.")
-                        logger.info("Already logged in")
-                        already_logged_in = True
-                        break
-                except:
-                    continue
-            
-            if already_logged_in:
-                return True
-                
-            print("→ Not logged in. Proceeding with login...")
-            logger.info("Not logged in, proceeding with login")
-            
-            try:
-                await self.page.wait_for_selector('input[type="email"]', timeout=20000, state='visible')
-            except:
+            logged_in = await self._wait_for_app_or_login()
+            if logged_in is None:
                 current_url = self.page.url
                 if '/auth/login' not in current_url:
                     print("✓ Already logged in (redirected).")
@@ -190,14 +416,20 @@ class JobTodayWebhookScraper:
                     return True
                 raise Exception("Login form not found")
             
-            email_input = self.page.locator('input[type="email"]')
+            if logged_in:
+                print("✓ Already logged in.")
+                logger.info("Already logged in")
+                return True
+                
+            print("→ Not logged in. Proceeding with login...")
+            logger.info("Not logged in, proceeding with login")
+            
+            email_input = self.page.locator(self.email_selector)
             password_input = self.page.locator('input[type="password"]')
             
             logger.info("Filling in credentials")
             await email_input.fill(self.email)
-            await asyncio.sleep(1)
             await password_input.fill(self.password)
-            await asyncio.sleep(1)
             
             print("→ Clicking submit button...")
             logger.info("Submitting login form")
@@ -205,7 +437,10 @@ class JobTodayWebhookScraper:
             
             print("→ Waiting for login to complete...")
             logger.info("Waiting for login to complete")
-            await asyncio.sleep(5)
+            try:
+                await self.page.wait_for_url(lambda url: '/auth/login' not in url, timeout=15000)
+            except PlaywrightTimeout:
+                logger.info("Still on login URL, checking for post-login elements")
             
             login_confirmed = False
             
@@ -214,20 +449,16 @@ class JobTodayWebhookScraper:
                 logger.info("Login confirmed - URL changed")
             
             if not login_confirmed:
-                for selector in post_login_selectors:
-                    try:
-                        count = await self.page.locator(selector).count()
-                        if count > 0:
-                            login_confirmed = True
-                            logger.info(f"Login confirmed - found element: {selector}")
-                            break
-                    except:
-                        continue
+                try:
+                    if await self.page.locator(self.post_login_selector).count() > 0:
+                        login_confirmed = True
+                        logger.info("Login confirmed - found post-login element")
+                except:
+                    pass
             
             if login_confirmed:
                 print("✓ Login successful")
                 logger.info("✓ Login successful")
-                await asyncio.sleep(3)
                 return True
             else:
                 print(f"✗ Could not confirm login")
@@ -247,40 +478,33 @@ class JobTodayWebhookScraper:
             if success:
                 return True
             if attempt < max_attempts:
-                logger.info("Waiting before retry...")
-                await asyncio.sleep(10)
+                wait = _backoff(attempt, base=10)
+                logger.info(f"Waiting {wait:.1f}s before retry...")
+                await asyncio.sleep(wait)
         return False
     
     async def save_session(self, filename='session.json'):
         try:
-            storage = await self.context.storage_state()
-            with open(filename, 'w') as f:
-                json.dump(storage, f)
+            await self.context.storage_state(path=filename)
             print(f"✓ Session saved to {filename}")
             logger.info(f"Session saved to {filename}")
         except Exception as e:
             print(f"⚠ Could not save session: {e}")
             logger.warning(f"Could not save session: {e}")
 
+    @staticmethod
+    def _read_session(filename):
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+    
     async def load_session(self, filename='session.json'):
         try:
             if not os.path.exists(filename):
                 logger.info("No session file found")
                 return False
             
-            with open(filename, 'r') as f:
-                storage_state = json.load(f)
-            
-            if hasattr(self, 'context'):
-                await self.context.close()
-            
-            self.context = await self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                storage_state=storage_state
-            )
-            
-            await self.context.grant_permissions(['geolocation'], origin=self.base_url)
+            session_state = await asyncio.to_thread(self._read_session, filename)
+            self.context = await self.new_context(storage_state=session_state)
             self.page = await self.context.new_page()
             
             print(f"✓ Session loaded from {filename}")
@@ -291,19 +515,46 @@ class JobTodayWebhookScraper:
             logger.warning(f"Could not load session: {e}")
             return False
         
+    async def ensure_context(self):
+        """Open a logged-in context, restoring the saved session before falling back to login"""
+        if await self.load_session():
+            print("→ Verifying session...")
+            logger.info("Verifying existing session...")
+            await self.page.goto(f"{self.base_url}/jobs", wait_until='commit', timeout=120000)
+            logged_in = await self._wait_for_app_or_login()
+            if logged_in is None:
+                logged_in = '/auth/login' not in self.page.url
+            
+            if logged_in:
+                print("   ✓ Session valid")
+                logger.info("Session still valid")
+                return True
+            
+            print("   Session expired, re-login...")
+            logger.warning("Session expired, re-authenticating")
+        else:
+            logger.info("Creating browser context...")
+            self.context = await self.new_context()
+            self.page = await self.context.new_page()
+        
+        if not await self.login_with_retry(max_attempts=3):
+            return False
+        await self.save_session()
+        return True
+        
     async def scrape_job_role(self):
         try:
             print("\n→ Scraping job role...")
             logger.info("Scraping job role")
             main_job_url = f"{self.base_url}/jobs/{self.job_id}"
-            await self.page.goto(main_job_url, wait_until='domcontentloaded', timeout=180000)
-            await asyncio.sleep(5)
+            await self.page.goto(main_job_url, wait_until='commit', timeout=180000)
             
+            # The locator auto-waits, so one call both waits for and reads the role
             role_selector = 'div.bg-white.rounded-b-xl div.text-black.font-bold.mb-1'
-            await self.page.wait_for_selector(role_selector, timeout=40000)
-            
-            role_element = self.page.locator(role_selector).first
-            self.job_role = await role_element.inner_text()
+            role_text = await self.page.locator(role_selector).first.text_content(timeout=15000)
+            if not role_text or not role_text.strip():
+                raise Exception("Job role element is empty")
+            self.job_role = role_text.strip()
             
             print(f"   ✓ Job role scraped: {self.job_role}")
             logger.info(f"Job role scraped: {self.job_role}")
@@ -317,25 +568,25 @@ class JobTodayWebhookScraper:
             logger.info(f"Using default role: {self.job_role}")
             return self.job_role
 
-    async def dismiss_popups(self):
+    async def dismiss_popups(self, page=None):
         """Dismiss any popups that might interfere with scraping"""
+        page = page or self.page
         try:
             logger.debug("Checking for popups to dismiss")
             popup_handlers = [
                 {'selector': 'div:text-is("Not now")', 'action': 'click', 'name': '"Not now" button'},
                 {'selector': 'button:has-text("Got it")', 'action': 'click', 'name': 'Contact Limit popup'},
                 {'selector': 'button[aria-label="Close"]', 'action': 'click', 'name': 'Close button'},
-                {'selector': '[role="dialog"]', 'action': 'escape', 'name': 'Dialog (Escape key)'},
-                {'selector': '[id^=intercom-container], .intercom-lightweight-app, .intercom-messenger-frame', 
-                 'action': 'remove', 'name': 'Intercom widget'}
+                {'selector': '[role="dialog"]', 'action': 'escape', 'name': 'Dialog (Escape key)'}
             ]
             
             for handler in popup_handlers:
                 try:
-                    elements = self.page.locator(handler['selector'])
-                    if await elements.count() > 0:
+                    elements = page.locator(handler['selector'])
+                    element_count = await elements.count()
+                    if element_count > 0:
                         if handler['action'] == 'click':
-                            for i in range(await elements.count()):
+                            for i in range(element_count):
                                 try:
                                     await elements.nth(i).click(timeout=5000, force=True)
                                     logger.info(f"Dismissed {handler['name']}")
@@ -344,43 +595,104 @@ class JobTodayWebhookScraper:
                                     pass
                         elif handler['action'] == 'escape':
                             try:
-                                await self.page.keyboard.press('Escape')
+                                await page.keyboard.press('Escape')
                                 logger.info(f"Pressed Escape for {handler['name']}")
                                 await asyncio.sleep(0.5)
                             except:
                                 pass
-                        elif handler['action'] == 'remove':
-                            await self.page.evaluate(f'document.querySelectorAll("{handler["selector"]}").forEach(el => el.remove())')
-                            logger.info(f"Removed {handler['name']}")
                 except:
                     pass
         except Exception as e:
             logger.debug(f"Error dismissing popups: {e}")
 
-    async def scrape_chat_history(self):
+    async def scrape_chat(self, page, profile_pane, previous=None):
+        """Open the candidate's chat and return (chat_history, chat_summary).
+        previous holds details from an earlier run, whose summary is reused if the chat is unchanged"""
+        chat_history = 'N/A'
+        chat_summary = 'N/A'
+        
+        try:
+            print("   → Attempting to scrape chat history...")
+            logger.info("Attempting to scrape chat history")
+            
+            await self.dismiss_popups(page)
+            
+            chat_button = profile_pane.locator(self.chat_button_selector).first
+
+            if await chat_button.count() > 0:
+                logger.info("Clicking chat button")
+                await chat_button.click()
+                
+                print("      → Navigating to messenger...")
+                logger.info("Navigating to messenger")
+                await page.wait_for_url(lambda url: '/messenger' in url, timeout=90000)
+                
+                await self.dismiss_popups(page)
+                
+                chat_history = await self.scrape_chat_history(page)
+                
+                # Generate summary, unless the chat hasn't changed since it was last summarized
+                if previous and previous.get('chat_history') == chat_history and previous.get('chat_summary', 'N/A') != 'N/A':
+                    logger.info("Chat unchanged, reusing previous summary")
+                    chat_summary = previous['chat_summary']
+                else:
+                    chat_summary = await self.generate_chat_summary(chat_history)
+                
+                logger.info("Chat history and summary completed")
+            else:
+                logger.info("Chat button not found")
+                print("   ! Chat button not found.")
+
+        except Exception as e:
+            logger.error(f"Could not scrape chat history: {e}")
+            print(f"   ✗ Could not scrape chat history: {str(e).splitlines()[0]}")
+            if '/messenger' in page.url:
+                try:
+                    await page.go_back(wait_until='domcontentloaded')
+                    logger.info("Navigated back from messenger")
+                except Exception as nav_e:
+                    logger.error(f"Failed to navigate back: {nav_e}")
+
+        return chat_history, chat_summary
+
+    async def scrape_chat_history(self, page=None):
         """Scrapes the full chat history from the messenger page"""
+        page = page or self.page
         print("      → Scraping chat history...")
         logger.info("Scraping chat history")
         chat_log = []
 
         try:
             chat_container_selector = 'div._container_i9fq9_12'
-            await self.page.wait_for_selector(chat_container_selector, timeout=30000)
-            
-            all_blocks = self.page.locator(f'{chat_container_selector} > div')
-            count = await all_blocks.count()
-            logger.info(f"Found {count} chat blocks")
+            # Wait for the first message block, not just the empty container
+            await page.wait_for_selector(f'{chat_container_selector} > div', state='attached', timeout=30000)
+            
+            # Snapshot every block's relevant text in one round-trip, then classify locally
+            blocks = await page.locator(f'{chat_container_selector} > div').evaluate_all("""blocks => blocks.map(b => {
+                const text = s => { const n = b.querySelector(s); return n ? n.innerText : null; };
+                return {
+                    cls: b.getAttribute('class') || '',
+                    date: text('div.r-1rbol0d'),
+                    recruiter_time: text('div[class*="r-a5pmau"], div[style*="margin-right: 12px;"]'),
+                    recruiter_msg: text('div.text-white.break-word'),
+                    recruiter_system: text('div[class*="r-3hmvjm"]'),
+                    candidate_skip: !!b.querySelector('div[class*="r-6koalj"]'),
+                    candidate_time: text('div[class*="r-1b7u577"]'),
+                    candidate_msgs: [...b.querySelectorAll('div.break-word[style*="white-space: pre-wrap;"]')].map(n => n.innerText),
+                    candidate_file: text('div[class*="r-1iln25a"]'),
+                    candidate_applied: text('div[class*="r-1gjx2kl"]'),
+                };
+            })""")
+            logger.info(f"Found {len(blocks)} chat blocks")
 
-            for i in range(count):
-                block = all_blocks.nth(i)
+            for block in blocks:
                 entry = ""
-                block_class = await block.get_attribute('class') or ""
+                block_class = block['cls']
 
                 # Date separator
                 if 'r-1awozwy' in block_class and 'r-5oul0u' in block_class:
-                    date_locator = block.locator('div.r-1rbol0d')
-                    if await date_locator.count() > 0:
-                        date_text = await date_locator.first.inner_text(timeout=500)
+                    date_text = block['date']
+                    if date_text is not None:
                         if any(day in date_text for day in ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']):
                             entry = f"\n--- {date_text.strip()} ---"
                             if entry and entry not in chat_log:
@@ -389,17 +701,14 @@ class JobTodayWebhookScraper:
                 
                 # Recruiter messages
                 if 'r-88pszg' in block_class:
-                    time_locator = block.locator('div[class*="r-a5pmau"], div[style*="margin-right: 12px;"]')
-                    time = await time_locator.first.inner_text() if await time_locator.count() > 0 else ""
+                    time = block['recruiter_time'] or ""
                     
-                    msg_text_locator = block.locator('div.text-white.break-word')
-                    if await msg_text_locator.count() > 0:
-                        msg = await msg_text_locator.first.inner_text()
+                    if block['recruiter_msg'] is not None:
+                        msg = block['recruiter_msg']
                         if msg:
                             entry = f"[{time}] Recruiter: {msg.strip()}"
-                    elif await block.locator('div[class*="r-3hmvjm"]').count() > 0:
-                        system_msg = await block.locator('div[class*="r-3hmvjm"]').first.inner_text()
-                        entry = f"[{time}] System: {' '.join(system_msg.split())}"
+                    elif block['recruiter_system'] is not None:
+                        entry = f"[{time}] System: {' '.join(block['recruiter_system'].split())}"
                     
                     if entry and entry not in chat_log:
                         chat_log.append(entry)
@@ -407,27 +716,19 @@ class JobTodayWebhookScraper:
 
                 # Candidate messages
                 if 'r-1jkjb' in block_class:
-                    if await block.locator('div[class*="r-6koalj"]').count() > 0:
+                    if block['candidate_skip']:
                         continue
 
-                    time_locator = block.locator('div[class*="r-1b7u577"]')
-                    time = await time_locator.first.inner_text() if await time_locator.count() > 0 else ""
-                    
-                    msg_text_locator = block.locator('div.break-word[style*="white-space: pre-wrap;"]')
-                    file_locator = block.locator('div[class*="r-1iln25a"]')
-                    applied_locator = block.locator('div[class*="r-1gjx2kl"]')
+                    time = block['candidate_time'] or ""
 
-                    if await msg_text_locator.count() > 0:
-                        texts = await msg_text_locator.all_inner_texts()
-                        msg = "\n".join(t.strip() for t in texts if t.strip())
+                    if block['candidate_msgs']:
+                        msg = "\n".join(t.strip() for t in block['candidate_msgs'] if t.strip())
                         if msg:
                             entry = f"[{time}] Candidate: {msg}"
-                    elif await file_locator.count() > 0:
-                        file_name = await file_locator.first.inner_text()
-                        entry = f"[{time}] Candidate: [Sent File: {file_name.strip()}]"
-                    elif await applied_locator.count() > 0:
-                        system_msg = await applied_locator.first.inner_text()
-                        entry = f"[{time}] System: {' '.join(system_msg.split())}"
+                    elif block['candidate_file'] is not None:
+                        entry = f"[{time}] Candidate: [Sent File: {block['candidate_file'].strip()}]"
+                    elif block['candidate_applied'] is not None:
+                        entry = f"[{time}] System: {' '.join(block['candidate_applied'].split())}"
                     
                     if entry and entry not in chat_log:
                         chat_log.append(entry)
@@ -491,34 +792,69 @@ class JobTodayWebhookScraper:
         if hasattr(self, 'progress_tracker'):
             self.progress_tracker.update(section=section_name)
         
-        # Load the section page
+        # Each section loads and counts on its own page so sections can overlap
+        page = await self.context.new_page()
+        try:
+            total_candidates = await self._load_section(page, section_name, section_url)
+        finally:
+            await page.close()
+        if not total_candidates:
+            return
+        
+        self._total_candidates += total_candidates
+        if hasattr(self, 'progress_tracker'):
+            self.progress_tracker.update(total=self._total_candidates)
+
+        print(f"   ✓ Found {total_candidates} candidates")
+        logger.info(f"Starting to process {total_candidates} candidates")
+
+        # Fan candidate indices out to workers, each with its own browser context
+        queue = asyncio.Queue()
+        for i in range(total_candidates):
+            queue.put_nowait(i)
+        
+        worker_count = max(1, min(self.concurrency, total_candidates))
+        logger.info(f"Scraping with up to {worker_count} parallel contexts")
+        storage_state = await self.context.storage_state()
+        
+        await asyncio.gather(*(
+            self._candidate_worker(worker_id, storage_state, section_url, queue, total_candidates)
+            for worker_id in range(1, worker_count + 1)
+        ))
+        
+        logger.info(f"Finished section: {section_name}")
+        print(f"\n✓ Finished section: {section_name}")
+        print(f"   Total: {total_candidates}, Scraped: {len([c for c in self.candidates if c.get('name') != 'N/A'])}")
+
+    async def _load_section(self, page, section_name, section_url):
+        """Load a section's list on page and return how many candidates it shows"""
         page_loaded = False
         for attempt in range(1, 4):
             try:
                 print(f"   → Loading page (attempt {attempt}/3)...")
                 logger.info(f"Loading page attempt {attempt}/3")
                 
-                await self.page.goto(section_url, wait_until='networkidle', timeout=180000)
+                await page.goto(section_url, wait_until='networkidle', timeout=180000)
                 logger.info("Page loaded with networkidle")
-                await asyncio.sleep(3)
                 
-                current_url = self.page.url
+                current_url = page.url
                 logger.info(f"Current URL: {current_url}")
                 
                 if '/auth/login' in current_url:
                     print("   ⚠ Session expired, re-authenticating...")
                     logger.warning("Session expired, re-authenticating")
-                    if not await self.login_with_retry(max_attempts=2):
-                        raise Exception("Re-login failed")
-                    await self.page.goto(section_url, wait_until='networkidle', timeout=180000)
-                    await asyncio.sleep(3)
+                    # login() drives self.page; the session is shared with this page's context
+                    async with self._login_lock:
+                        if not await self.login_with_retry(max_attempts=2):
+                            raise Exception("Re-login failed")
+                    await page.goto(section_url, wait_until='networkidle', timeout=180000)
                 
                 list_container_selector = 'div.col-span-1.overflow-y-auto'
                 logger.info(f"Waiting for list container")
                 
                 try:
-                    await self.page.wait_for_selector(list_container_selector, timeout=60000)
-                    container_count = await self.page.locator(list_container_selector).count()
+                    await page.wait_for_selector(list_container_selector, state='visible', timeout=60000)
+                    container_count = await page.locator(list_container_selector).count()
                     logger.info(f"✓ Found {container_count} list containers")
                     print("   ✓ List container found")
                     page_loaded = True
@@ -528,7 +864,7 @@ class JobTodayWebhookScraper:
                     
                     if attempt < 3:
                         logger.info("Retrying page load...")
-                        await asyncio.sleep(5)
+                        await asyncio.sleep(_backoff(attempt, base=5))
                     else:
                         raise
                     
@@ -536,227 +872,255 @@ class JobTodayWebhookScraper:
                 logger.error(f"Load attempt {attempt} failed: {e}")
                 print(f"   ⚠ Load attempt {attempt} failed: {e}")
                 if attempt < 3:
-                    await asyncio.sleep(5)
+                    await asyncio.sleep(_backoff(attempt, base=5))
                 else:
                     raise
         
         if not page_loaded:
             raise Exception(f"Could not load section {section_name}")
         
-        await asyncio.sleep(3)
-        
         # Count candidates
-        candidate_button_selector = 'button:has(img[alt$="\'s avatar"])'
         logger.info(f"Looking for candidates")
         
         try:
-            await self.page.wait_for_selector(candidate_button_selector, timeout=30000)
-            total_candidates = await self.page.locator(candidate_button_selector).count()
+            await page.wait_for_selector(self.candidate_button_selector, state='visible', timeout=30000)
+            total_candidates = await page.locator(self.candidate_button_selector).count()
             logger.info(f"Found {total_candidates} candidate buttons")
         except PlaywrightTimeout:
             logger.warning(f"No candidates found in '{section_name}' section")
             print(f"   ! No candidates found in '{section_name}' section")
-            return
-        
-        if hasattr(self, 'progress_tracker'):
-            self.progress_tracker.update(total=total_candidates)
+            return 0
+        return total_candidates
 
-        print(f"   ✓ Found {total_candidates} candidates")
-        logger.info(f"Starting to process {total_candidates} candidates")
-
-        # Process each candidate with retry logic
-        i = 0
-        while i < total_candidates:
-            candidate_name = f"Candidate {i+1}"
-            try:
-                logger.info(f"{'='*50}")
-                logger.info(f"Processing candidate {i+1}/{total_candidates}")
-                print(f"\n--- Processing candidate {i+1}/{total_candidates} ---")
-                
-                if hasattr(self, 'progress_tracker'):
-                    self.progress_tracker.update(
-                        candidate=f"Loading {i+1}",
-                        processed=i
-                    )
-                
-                # Navigate back to list if needed
-                if i > 0:
-                    logger.info("Navigating back to list view...")
-                    
-                    try:
-                        await self.page.go_back(wait_until='domcontentloaded', timeout=60000)
-                        logger.info("Used browser back button")
-                        await asyncio.sleep(2)
-                    except:
-                        logger.info("Back button failed, using direct navigation")
-                        await self.page.goto(section_url, wait_until='domcontentloaded', timeout=120000)
-                        await asyncio.sleep(3)
-                    
-                    try:
-                        await self.page.wait_for_selector(candidate_button_selector, timeout=40000)
-                        logger.info("List reloaded successfully")
-                    except:
-                        logger.error("Could not reload list, trying full page reload")
-                        await self.page.goto(section_url, wait_until='networkidle', timeout=180000)
-                        await asyncio.sleep(3)
-                        await self.page.wait_for_selector(candidate_button_selector, timeout=40000)
-                
-                # Verify candidate count
-                current_count = await self.page.locator(candidate_button_selector).count()
-                logger.info(f"Current candidate count: {current_count}")
-                
-                if i >= current_count:
-                    logger.warning(f"Candidate index {i} out of range (only {current_count} candidates)")
-                    print(f"   ⚠ Skipping - candidate index out of range")
-                    i += 1
-                    continue
-                
-                # Get candidate button and name
-                candidate_button = self.page.locator(candidate_button_selector).nth(i)
-                logger.info(f"Got candidate button at index {i}")
-                
-                try:
-                    candidate_name_elem = candidate_button.locator('.font-bold').first
-                    candidate_name = await candidate_name_elem.inner_text(timeout=20000)
-                    logger.info(f"Candidate name: {candidate_name}")
-                    print(f"   → Candidate name: {candidate_name}")
-                except Exception as name_error:
-                    logger.error(f"Could not get candidate name: {name_error}")
-                    candidate_name = f"Candidate {i+1}"
-                
-                # Skip if already processed
-                if candidate_name in self.processed_names:
-                    logger.info(f"Skipping {candidate_name} - already processed")
-                    print(f"   ✓ Skipping (already processed)")
-                    i += 1
-                    continue
-                
-                # Retry logic
-                max_retries = 1
-                attempt_count = self.candidate_retry_attempts.get(candidate_name, 0)
-                
-                if attempt_count > max_retries:
-                    logger.warning(f"Max retries reached for {candidate_name}")
-                    print(f"   ! Max retries reached. Skipping.")
-                    self.processed_names.add(candidate_name)
-                    i += 1
-                    continue
-                
-                self.candidate_retry_attempts[candidate_name] = attempt_count + 1
-                
-                if attempt_count > 0:
-                    logger.info(f"RETRY attempt {attempt_count + 1} for {candidate_name}")
-                    print(f"   → RETRY attempt {attempt_count + 1}")
-                
-                if hasattr(self, 'progress_tracker'):
-                    self.progress_tracker.update(candidate=candidate_name)
-                
-                # Get application date
-                application_date = "N/A"
-                try:
-                    date_locator = candidate_button.locator('p:has-text("Applied on")')
-                    if await date_locator.count() > 0:
-                        application_date = await date_locator.inner_text(timeout=10000)
-                        logger.info(f"Application date: {application_date}")
-                except Exception as date_error:
-                    logger.warning(f"Could not get application date: {date_error}")
-                
-                # Click candidate
-                logger.info("Clicking candidate button...")
-                print(f"   → Clicking candidate...")
-                
+    async def _candidate_worker(self, worker_id, storage_state, section_url, queue, total_candidates):
+        """Pull candidate indices off the queue and scrape them on a dedicated page"""
+        async with self._context_slots:
+            if queue.empty():
+                return
+            context = await self.new_context(storage_state=storage_state)
+            await self._run_worker(worker_id, context, section_url, queue, total_candidates)
+    
+    async def _run_worker(self, worker_id, context, section_url, queue, total_candidates):
+        try:
+            page = await context.new_page()
+            while True:
                 try:
-                    await candidate_button.click(timeout=60000)
-                    logger.info("Click successful")
-                except Exception as click_error:
-                    logger.error(f"Click failed: {click_error}")
-                    print(f"   ✗ Click failed")
-                    i += 1
-                    continue
-                
-                await asyncio.sleep(3)
-                
-                # Wait for profile
-                profile_selector = 'button:has-text("Chat with")'
-                logger.info(f"Waiting for profile to load")
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
                 
-                try:
-                    await self.page.wait_for_selector(profile_selector, timeout=60000)
-                    logger.info("✓ Profile loaded")
-                    print("   ✓ Profile loaded")
-                except PlaywrightTimeout:
-                    logger.error("Profile load timeout")
-                    print(f"   ✗ Profile timeout, skipping")
-                    i += 1
-                    continue
+                retry = await self._scrape_candidate_at(page, section_url, i, total_candidates)
+                if retry:
+                    queue.put_nowait(i)
+                else:
+                    self._processed_count += 1
+                    if hasattr(self, 'progress_tracker'):
+                        self.progress_tracker.update(processed=self._processed_count)
                 
-                # Dismiss popups
-                await self.dismiss_popups()
-                await asyncio.sleep(2)
+                if page.is_closed():
+                    logger.error(f"[worker {worker_id}] Page closed unexpectedly")
+                    print("   ! Browser closed unexpectedly. Halting worker.")
+                    break
+        except Exception as e:
+            logger.error(f"[worker {worker_id}] Worker failed: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            self._locked_contexts.discard(context)
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"[worker {worker_id}] Could not close context: {e}")
+
+    async def _ensure_list(self, page, section_url):
+        """Bring back the section's candidate list, reloading the page only as a last resort"""
+        candidate_buttons = page.locator(self.candidate_button_selector)
+        
+        # The SPA keeps the list mounted next to the profile pane; only the
+        # messenger view replaces it, and browser history brings it back
+        if '/messenger' in page.url:
+            try:
+                await page.go_back(wait_until='commit', timeout=60000)
+                logger.info("Used browser back button")
+            except Exception as back_error:
+                logger.info(f"Back button failed: {back_error}")
+        
+        if page.url.startswith(section_url):
+            try:
+                await candidate_buttons.first.wait_for(state='attached', timeout=10000)
+                logger.info("List still mounted, skipping reload")
+                self._locked_contexts.add(page.context)
+                return
+            except PlaywrightTimeout:
+                logger.info("List not mounted, falling back to navigation")
+        
+        # A fresh page load gets the full set of scripts it asks for
+        self._locked_contexts.discard(page.context)
+        await page.goto(section_url, wait_until='commit', timeout=120000)
+        try:
+            await page.wait_for_selector(self.candidate_button_selector, timeout=40000)
+            logger.info("List loaded successfully")
+        except:
+            logger.error("Could not load list, trying full page reload")
+            await page.goto(section_url, wait_until='networkidle', timeout=180000)
+            await page.wait_for_selector(self.candidate_button_selector, timeout=40000)
+        self._locked_contexts.add(page.context)
+
+    def mark_processed(self, candidate_name):
+        """Mark a candidate as done; its retry counter is no longer needed"""
+        self.processed_names.add(candidate_name)
+        self.candidate_retry_attempts.pop(candidate_name, None)
+    
+    async def _scrape_candidate_at(self, page, section_url, i, total_candidates):
+        """Open the candidate at index i of the section list and scrape them.
+        Returns True if the candidate should be retried."""
+        candidate_name = f"Candidate {i+1}"
+        claimed = False
+        try:
+            logger.info(f"{'='*50}")
+            logger.info(f"Processing candidate {i+1}/{total_candidates}")
+            print(f"\n--- Processing candidate {i+1}/{total_candidates} ---")
+            
+            if hasattr(self, 'progress_tracker'):
+                self.progress_tracker.update(candidate=f"Loading {i+1}")
+            
+            # Make sure the list view is showing on this worker's page
+            await self._ensure_list(page, section_url)
+            
+            # List size plus this card's name and date, in one round-trip
+            candidate_buttons = page.locator(self.candidate_button_selector)
+            preview = await candidate_buttons.evaluate_all(self.candidate_preview_js, i)
+            current_count = preview['count']
+            logger.info(f"Current candidate count: {current_count}")
+            
+            if i >= current_count:
+                logger.warning(f"Candidate index {i} out of range (only {current_count} candidates)")
+                print(f"   ⚠ Skipping - candidate index out of range")
+                return False
+            
+            candidate_button = candidate_buttons.nth(i)
+            if preview['name']:
+                candidate_name = preview['name']
+                logger.info(f"Candidate name: {candidate_name}")
+                print(f"   → Candidate name: {candidate_name}")
+            else:
+                logger.error(f"Could not get candidate name at index {i}")
+            
+            # Skip if already processed
+            if candidate_name in self.processed_names:
+                logger.info(f"Skipping {candidate_name} - already processed")
+                print(f"   ✓ Skipping (already processed)")
+                return False
+            if candidate_name in self._in_flight:
+                logger.info(f"Skipping {candidate_name} - being scraped from another section")
+                print(f"   ✓ Skipping (in progress elsewhere)")
+                return False
+            self._in_flight.add(candidate_name)
+            claimed = True
+            
+            # Retry logic
+            max_retries = 1
+            attempt_count = self.candidate_retry_attempts.get(candidate_name, 0)
+            
+            if attempt_count > max_retries:
+                logger.warning(f"Max retries reached for {candidate_name}")
+                print(f"   ! Max retries reached. Skipping.")
+                self.mark_processed(candidate_name)
+                return False
+            
+            self.candidate_retry_attempts[candidate_name] = attempt_count + 1
+            
+            if attempt_count > 0:
+                logger.info(f"RETRY attempt {attempt_count + 1} for {candidate_name}")
+                print(f"   → RETRY attempt {attempt_count + 1}")
+            
+            if hasattr(self, 'progress_tracker'):
+                self.progress_tracker.update(candidate=candidate_name)
+            
+            application_date = preview['applied'] or "N/A"
+            logger.info(f"Application date: {application_date}")
+            
+            # Click candidate
+            logger.info("Clicking candidate button...")
+            print(f"   → Clicking candidate...")
+            
+            try:
+                await candidate_button.click(timeout=60000)
+                logger.info("Click successful")
+            except Exception as click_error:
+                logger.error(f"Click failed: {click_error}")
+                print(f"   ✗ Click failed")
+                return False
+            
+            # Wait for profile
+            logger.info(f"Waiting for profile to load")
+            
+            try:
+                await page.wait_for_selector(self.chat_button_selector, timeout=60000)
+                logger.info("✓ Profile loaded")
+                print("   ✓ Profile loaded")
+            except PlaywrightTimeout:
+                logger.error("Profile load timeout")
+                print(f"   ✗ Profile timeout, skipping")
+                return False
+            
+            # The profile URL is only known once the candidate is open
+            cached = self._cached_candidate(page.url)
+            if cached:
+                # Profile and phone come from the cache; the chat may have moved on, so it's read again
+                logger.info(f"Reusing profile of {candidate_name} from an earlier run")
+                print(f"   ✓ Reusing profile from an earlier run, refreshing chat")
+                await self.dismiss_popups(page)
+                profile_pane = page.locator(self.profile_pane_selector)
+                cached['chat_history'], cached['chat_summary'] = await self.scrape_chat(page, profile_pane, previous=cached)
+                self.record_candidate(cached)
+                self._cache_candidate(cached, refresh_age=False)
+                self.mark_processed(candidate_name)
+                return False
+            
+            # Dismiss popups
+            await self.dismiss_popups(page)
+            
+            # Scrape details
+            logger.info("Scraping candidate details...")
+            print(f"   → Scraping details...")
+            
+            try:
+                details = await self.scrape_candidate_details(page.url, application_date, page=page)
                 
-                # Scrape details
-                logger.info("Scraping candidate details...")
-                print(f"   → Scraping details...")
+                # Validate phone number
+                phone = details.get('phone', 'N/A')
+                is_phone_valid = phone and phone != "N/A" and '…' not in phone and len(phone) >= 9
                 
-                try:
-                    details = await self.scrape_candidate_details(self.page.url, application_date)
-                    
-                    # Validate phone number
-                    phone = details.get('phone', 'N/A')
-                    is_phone_valid = phone and phone != "N/A" and '…' not in phone and len(phone) >= 9
-                    
-                    if is_phone_valid:
-                        logger.info(f"✓ Successfully scraped: {details.get('name', 'N/A')}")
-                        print(f"   ✓ Scraped: {details.get('name', 'N/A')}")
-                        self.candidates.append(details)
-                        self.processed_names.add(candidate_name)
-                        
-                        if hasattr(self, 'progress_tracker'):
-                            self.progress_tracker.update(processed=i+1)
+                if is_phone_valid:
+                    logger.info(f"✓ Successfully scraped: {details.get('name', 'N/A')}")
+                    print(f"   ✓ Scraped: {details.get('name', 'N/A')}")
+                    self.record_candidate(details)
+                    self._cache_candidate(details)
+                    self.mark_processed(candidate_name)
+                    return False  # SUCCESS - move to next candidate
+                else:
+                    logger.warning(f"Phone scraping failed for {candidate_name}")
+                    print(f"   ✗ Phone scraping failed. Will retry this candidate.")
+                    return True
                         
-                        i += 1  # SUCCESS - move to next candidate
-                    else:
-                        logger.warning(f"Phone scraping failed for {candidate_name}")
-                        print(f"   ✗ Phone scraping failed. Will retry this candidate.")
-                        # Don't increment i - will retry same candidate
-                            
-                except Exception as scrape_error:
-                    logger.error(f"Error scraping details: {scrape_error}")
-                    logger.error(traceback.format_exc())
-                    print(f"   ✗ Error scraping: {scrape_error}")
-                    i += 1  # Move on after error
-                
-            except Exception as e:
-                logger.error(f"Error processing candidate {i+1}: {e}")
+            except Exception as scrape_error:
+                logger.error(f"Error scraping details: {scrape_error}")
                 logger.error(traceback.format_exc())
-                print(f"   ✗ Error processing candidate {i+1}: {e}")
-                
-                try:
-                    logger.info("Attempting to recover by navigating back to list...")
-                    await self.page.goto(section_url, wait_until='domcontentloaded', timeout=120000)
-                    await asyncio.sleep(3)
-                except:
-                    logger.error("Could not recover")
-                
-                i += 1  # Move on after critical error
-                continue
+                print(f"   ✗ Error scraping: {scrape_error}")
+                return False  # Move on after error
             
-            finally:
-                if self.page.is_closed():
-                    logger.error("Page closed unexpectedly")
-                    print("   ! Browser closed unexpectedly. Halting.")
-                    break
-                if i < total_candidates:
-                    logger.info("Resetting to list view...")
-                    await self.page.goto(section_url, wait_until="domcontentloaded", timeout=90000)
-                    await asyncio.sleep(3)
-        
-        logger.info(f"Finished section: {section_name}")
-        print(f"\n✓ Finished section: {section_name}")
-        print(f"   Total: {total_candidates}, Scraped: {len([c for c in self.candidates if c.get('name') != 'N/A'])}")
+        except Exception as e:
+            logger.error(f"Error processing candidate {i+1}: {e}")
+            logger.error(traceback.format_exc())
+            print(f"   ✗ Error processing candidate {i+1}: {e}")
+            return False  # Move on after critical error
+        finally:
+            if claimed:
+                self._in_flight.discard(candidate_name)
 
-    async def scrape_candidate_details(self, candidate_url, application_date):
+    async def scrape_candidate_details(self, candidate_url, application_date, page=None):
         """Scrape candidate details including chat history and summary"""
+        page = page or self.page
         details = {
             'profile_url': candidate_url, 
             'application_date': application_date, 
@@ -764,65 +1128,60 @@ class JobTodayWebhookScraper:
         }
         
         try:
-            profile_pane = self.page.locator('div.col-span-1.overflow-y-auto:has(button:has-text("Chat with"))')
+            # Built once per candidate and reused by every step below
+            profile_pane = page.locator(self.profile_pane_selector)
 
-            async def get_text(locator, timeout=10000):
-                try: 
-                    await locator.wait_for(timeout=timeout, state='attached')
-                    text = await locator.inner_text(timeout=timeout)
-                    return text if text else "N/A"
-                except:
-                    return "N/A"
-
-            await self.dismiss_popups()
-            await asyncio.sleep(1)
+            await self.dismiss_popups(page)
             
-            # Name
-            details['name'] = await get_text(profile_pane.locator('div.font-bold.text-2xl').first)
+            # Text fields, read in a single round-trip to the page
+            try:
+                await profile_pane.locator(self.profile_fields[0][1]).first.wait_for(state='attached', timeout=10000)
+            except PlaywrightTimeout:
+                logger.warning("Profile name not rendered yet, reading fields anyway")
+            try:
+                details.update(await profile_pane.first.evaluate(
+                    self.profile_extract_js, [self.profile_fields, self.profile_sections]
+                ))
+            except Exception as e:
+                logger.error(f"Error reading profile fields: {e}")
+                details.update((field, "N/A") for field, _ in self.profile_fields + self.profile_sections)
             logger.info(f"Name: {details['name']}")
+            logger.info(f"Email: {details['email']}")
+            logger.info(f"Location: {details['location']}")
             
             # Phone with retry logic
             try:
-                phone_container = profile_pane.locator('div.flex.items-center.gap-2.mt-2:has(img[src*="IconPhoneFilled28"])')
+                phone_span = profile_pane.locator(self.phone_container_selector).locator('span').first
+                show_phone_button = profile_pane.locator(self.show_phone_selector)
                 phone_number = "N/A"
                 max_attempts = 3
 
                 for attempt in range(1, max_attempts + 1):
-                    phone_span = phone_container.locator('span').first
                     phone_text = await phone_span.text_content(timeout=6000) or ""
-                    current_phone_value = phone_text.replace("Show phone", "").strip()
+                    phone_number = phone_text.replace("Show phone", "").strip()
 
-                    if current_phone_value and '…' not in current_phone_value and len(current_phone_value) >= 9:
-                        phone_number = current_phone_value
+                    if phone_number and '…' not in phone_number and len(phone_number) >= 9:
                         logger.info(f"Phone retrieved successfully: {phone_number}")
                         break
 
-                    show_phone_button = profile_pane.locator('span.cursor-pointer.text-jt-blue-500:has-text("Show phone")')
                     if await show_phone_button.count() > 0:
                         try:
                             logger.info(f"Clicking 'Show phone' button (attempt {attempt})")
                             await show_phone_button.click(timeout=5000, force=True)
-                            await asyncio.sleep(2)
-                            await self.dismiss_popups()
-                            await asyncio.sleep(1)
-
-                            phone_text = await phone_span.text_content(timeout=6000) or ""
-                            phone_number = phone_text.replace("Show phone", "").strip()
-                            
-                            if phone_number and '…' not in phone_number and len(phone_number) >= 9:
-                                logger.info(f"Phone retrieved after click: {phone_number}")
-                                break
                         except Exception as click_error:
                             logger.warning(f"Error clicking show phone: {click_error}")
-                            pass
                     
-                    if attempt < max_attempts:
-                        logger.info(f"Phone not fully loaded, waiting...")
-                        await asyncio.sleep(2)
-                    else:
-                        phone_text = await phone_span.text_content(timeout=6000) or ""
-                        phone_number = phone_text.replace("Show phone", "").strip()
-                        logger.warning(f"Final phone value: {phone_number}")
+                    # Resolves as soon as the number renders instead of sleeping a fixed time
+                    try:
+                        phone_handle = await phone_span.element_handle(timeout=6000)
+                        await page.wait_for_function(self.phone_revealed_js, arg=phone_handle, timeout=3000)
+                    except PlaywrightTimeout:
+                        logger.info(f"Phone not fully loaded, dismissing popups...")
+                        await self.dismiss_popups(page)
+                else:
+                    phone_text = await phone_span.text_content(timeout=6000) or ""
+                    phone_number = phone_text.replace("Show phone", "").strip()
+                    logger.warning(f"Final phone value: {phone_number}")
                 
                 details['phone'] = phone_number
 
@@ -830,90 +1189,10 @@ class JobTodayWebhookScraper:
                 logger.error(f"Error getting phone: {e}")
                 details['phone'] = "N/A"
             
-            await self.dismiss_popups()
-            
-            # Email
-            details['email'] = await get_text(profile_pane.locator('a[href^="mailto:"]').first)
-            logger.info(f"Email: {details['email']}")
-            
-            # Location
-            details['location'] = await get_text(profile_pane.locator('div:has(img[src*="IconPinThinBlack20"]) > span').first)
-            logger.info(f"Location: {details['location']}")
-            
-            # About
-            try:
-                about_div = profile_pane.locator('hr.my-6 + div.px-4.break-word').first
-                details['about'] = await get_text(about_div)
-            except:
-                details['about'] = "N/A"
-            
-            # Certificates
-            try:
-                certs_header = profile_pane.locator('div.font-bold.text-xl:has-text("Certificates")').first
-                certs_block = certs_header.locator('xpath=./following-sibling::div[1]')
-                details['certificates'] = await get_text(certs_block)
-            except:
-                details['certificates'] = "N/A"
-                
-            # Experience
-            try:
-                exp_header = profile_pane.locator('div.font-bold.text-xl:has-text("Experience")').first
-                exp_block = exp_header.locator('xpath=./following-sibling::div[1]')
-                details['experience'] = await get_text(exp_block)
-            except:
-                details['experience'] = "N/A"
-                
-            # Languages
-            try:
-                lang_header = profile_pane.locator('div.font-bold.text-xl:has-text("Languages")').first
-                lang_block = lang_header.locator('xpath=./following-sibling::div[1]')
-                details['languages'] = await get_text(lang_block)
-            except:
-                details['languages'] = "N/A"
+            await self.dismiss_popups(page)
 
             # Chat history and summary
-            details['chat_history'] = 'N/A'
-            details['chat_summary'] = 'N/A'
-            
-            try:
-                print("   → Attempting to scrape chat history...")
-                logger.info("Attempting to scrape chat history")
-                
-                await self.dismiss_popups()
-                
-                chat_button_selector = 'button:has-text("Chat with")'
-                chat_button = profile_pane.locator(chat_button_selector).first
-
-                if await chat_button.count() > 0:
-                    logger.info("Clicking chat button")
-                    await chat_button.click()
-                    
-                    print("      → Navigating to messenger...")
-                    logger.info("Navigating to messenger")
-                    await self.page.wait_for_url(lambda url: '/messenger' in url, timeout=90000)
-                    await asyncio.sleep(3)
-                    
-                    await self.dismiss_popups()
-                    
-                    details['chat_history'] = await self.scrape_chat_history()
-                    
-                    # Generate summary
-                    details['chat_summary'] = await self.generate_chat_summary(details['chat_history'])
-                    
-                    logger.info("Chat history and summary completed")
-                else:
-                    logger.info("Chat button not found")
-                    print("   ! Chat button not found.")
-
-            except Exception as e:
-                logger.error(f"Could not scrape chat history: {e}")
-                print(f"   ✗ Could not scrape chat history: {str(e).splitlines()[0]}")
-                if '/messenger' in self.page.url:
-                    try:
-                        await self.page.go_back(wait_until='domcontentloaded')
-                        logger.info("Navigated back from messenger")
-                    except Exception as nav_e:
-                        logger.error(f"Failed to navigate back: {nav_e}")
+            details['chat_history'], details['chat_summary'] = await self.scrape_chat(page, profile_pane)
 
             return details
             
@@ -923,34 +1202,84 @@ class JobTodayWebhookScraper:
             print(f"      ✗ Error in scrape_candidate_details: {e}")
             return details
 
+    def _encode_payload(self, payload, compress=True):
+        """Serialize a JSON payload, gzip-compressed unless disabled"""
+        body = orjson.dumps(payload)
+        headers = {'Content-Type': 'application/json'}
+        if compress:
+            body = gzip.compress(body, compresslevel=3)
+            headers['Content-Encoding'] = 'gzip'
+        return body, headers
+
+    def _load_url_cache(self):
+        """Return (urls, scanned_at, full_scan_at) from the URL cache, or None if missing or stale"""
+        try:
+            with open(self.url_cache_file, 'rb') as f:
+                cache = orjson.loads(f.read())
+            full_scan_at = datetime.fromisoformat(cache['full_scan_at'])
+            if datetime.now(timezone.utc) - full_scan_at > self.url_cache_max_age:
+                logger.info("Airtable URL cache is stale, doing a full scan")
+                return None
+            urls = {_normalize_url(url) for url in cache['urls']}
+            return urls, datetime.fromisoformat(cache['scanned_at']), full_scan_at
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read Airtable URL cache: {e}")
+            return None
+
+    def _save_url_cache(self, urls, scanned_at, full_scan_at):
+        try:
+            cache = {'scanned_at': scanned_at.isoformat(), 'full_scan_at': full_scan_at.isoformat(), 'urls': sorted(urls)}
+            self._write_file(self.url_cache_file, orjson.dumps(cache))
+        except Exception as e:
+            logger.warning(f"Could not write Airtable URL cache: {e}")
+
     def get_existing_profiles(self):
-        """Fetch existing profiles from Airtable"""
+        """Fetch existing profiles from Airtable, only scanning records created since the cached scan"""
         if not self.airtable_token or not self.airtable_base_id:
-            return set()
-            
+            return frozenset()
+        
+        # On a failed fetch, whatever is known so far (cached plus already fetched
+        # pages) is still returned, so known profiles aren't pushed again as duplicates
+        existing_urls = set()
         try:
             print("→ Checking Airtable for existing candidates...")
             logger.info("Checking Airtable for existing candidates")
-            headers = {'Authorization': f'Bearer {self.airtable_token}'}
-            
-            existing_urls = set()
+            headers = self._airtable_headers
+            
+            # Margin for clock skew and records created while the previous scan ran
+            scan_started = datetime.now(timezone.utc) - timedelta(minutes=5)
+            cached = self._load_url_cache()
+            if cached:
+                existing_urls, cached_at, full_scan_at = cached
+                since = cached_at.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+                logger.info(f"Loaded {len(existing_urls)} cached URLs, fetching records created since {since}")
+            else:
+                full_scan_at = scan_started
             offset = None
             
             while True:
+                if self._stop_profile_scan.is_set():
+                    logger.info("Run ended, abandoning Airtable scan")
+                    return frozenset()
                 params = {'fields[]': 'Profile URL', 'pageSize': 100}
+                if cached:
+                    params['filterByFormula'] = f"IS_AFTER(CREATED_TIME(), '{since}')"
                 if offset:
                     params['offset'] = offset
                 
-                response = requests.get(self.airtable_api_url, headers=headers, params=params, timeout=60)
+                self._airtable_bucket.acquire()
+                response = self.http.get(self.airtable_api_url, headers=headers, params=params, timeout=60)
                 
                 if response.status_code != 200:
-                    logger.warning(f"Could not fetch records: {response.status_code}")
+                    logger.warning(f"Could not fetch records: {response.status_code}, using {len(existing_urls)} known URLs")
                     print(f"   ⚠ Could not fetch records: {response.status_code}")
-                    return set()
+                    return frozenset(existing_urls)
                 
-                data = response.json()
+                data = orjson.loads(response.content)
                 for record in data.get('records', []):
-                    url = record.get('fields', {}).get('Profile URL', '')
+                    url = _normalize_url(record.get('fields', {}).get('Profile URL', ''))
                     if url:
                         existing_urls.add(url)
                 
@@ -958,28 +1287,50 @@ class JobTodayWebhookScraper:
                 if not offset:
                     break
             
+            self._save_url_cache(existing_urls, scan_started, full_scan_at)
             print(f"   ✓ Found {len(existing_urls)} existing candidates")
             logger.info(f"Found {len(existing_urls)} existing candidates in Airtable")
-            return existing_urls
+            return frozenset(existing_urls)
             
         except Exception as e:
-            logger.error(f"Error fetching from Airtable: {e}")
+            logger.error(f"Error fetching from Airtable: {e}, using {len(existing_urls)} known URLs")
             print(f"   ✗ Error: {e}")
-            return set()
+            return frozenset(existing_urls)
 
-    def push_to_airtable(self):
+    async def push_to_airtable(self):
         """Push new candidates to Airtable"""
         if not self.airtable_token or not self.airtable_base_id:
             print("⚠ Airtable not configured")
             logger.warning("Airtable not configured")
             return []
+        if not self.candidates:
+            print("   ! No candidates scraped, skipping.")
+            return []
             
         try:
             print("\n→ Pushing to Airtable...")
             logger.info("Pushing to Airtable")
             
-            existing_urls = self.get_existing_profiles()
-            new_candidates = [c for c in self.candidates if c.get('profile_url') not in existing_urls]
+            # Usually already fetched by the time scraping finishes (see run)
+            if self._existing_profiles_task:
+                existing_urls = await self._existing_profiles_task
+            else:
+                existing_urls = await asyncio.to_thread(self.get_existing_profiles)
+            # One pass: skip profiles already in Airtable or seen earlier in this run,
+            # building the Airtable records alongside the new candidates
+            new_candidates = []
+            records = []
+            seen_urls = set()
+            for candidate in self.candidates:
+                url = _normalize_url(candidate.get('profile_url'))
+                if url in existing_urls or url in seen_urls:
+                    continue
+                if url:
+                    seen_urls.add(url)
+                new_candidates.append(candidate)
+                fields = {column: candidate.get(key, '') for column, key in self.airtable_fields}
+                fields.update(self.airtable_defaults)
+                records.append({'fields': fields})
             
             if not new_candidates:
                 print("   ! All candidates already exist")
@@ -989,50 +1340,7 @@ class JobTodayWebhookScraper:
             print(f"   → Pushing {len(new_candidates)} new candidates")
             logger.info(f"Pushing {len(new_candidates)} new candidates")
             
-            headers = {
-                'Authorization': f'Bearer {self.airtable_token}',
-                'Content-Type': 'application/json'
-            }
-            
-            records = []
-            for candidate in new_candidates:
-                record = {
-                    'fields': {
-                        'Name': candidate.get('name', ''),
-                        'Phone': candidate.get('phone', ''),
-                        'Email': candidate.get('email', ''),
-                        'Location': candidate.get('location', ''),
-                        'About': candidate.get('about', ''),
-                        'Experience': candidate.get('experience', ''),
-                        'Languages': candidate.get('languages', ''),
-                        'Certificates': candidate.get('certificates', ''),
-                        'Profile URL': candidate.get('profile_url', ''),
-                        'Application Date': candidate.get('application_date', ''),
-                        'Role': candidate.get('job_role', ''),
-                        'Chat History': candidate.get('chat_history', ''),
-                        'Chat Summary': candidate.get('chat_summary', ''),
-                        'Status': 'New',
-                        'Notes': ''
-                    }
-                }
-                records.append(record)
-            
-            batch_size = 10
-            total_pushed = 0
-            
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i+batch_size]
-                payload = {'records': batch}
-                
-                response = requests.post(self.airtable_api_url, json=payload, headers=headers, timeout=60)
-                
-                if response.status_code == 200:
-                    total_pushed += len(batch)
-                    logger.info(f"Pushed batch {i//batch_size + 1}")
-                    print(f"   ✓ Pushed batch {i//batch_size + 1}")
-                else:
-                    logger.error(f"Error pushing batch: {response.status_code}")
-                    print(f"   ✗ Error: {response.status_code}")
+            total_pushed = await self.airtable_batch_create(records)
             
             print(f"✓ Pushed {total_pushed} candidates")
             logger.info(f"✓ Pushed {total_pushed} candidates to Airtable")
@@ -1044,29 +1352,106 @@ class JobTodayWebhookScraper:
             print(f"✗ Airtable error: {e}")
             return []
 
+    async def airtable_batch_create(self, records, batch_size=10):
+        """Create records in chunks of 10 (Airtable's per-request max), rate limited.
+        Returns the number of records created."""
+        batches = [records[i:i+batch_size] for i in range(0, len(records), batch_size)]
+        # Batches go out concurrently; the token bucket still holds them to 5 req/s
+        slots = asyncio.Semaphore(5)
+        
+        async def post(batch):
+            async with slots:
+                return await asyncio.to_thread(self._post_airtable_batch, batch)
+        
+        results = await asyncio.gather(*(post(batch) for batch in batches), return_exceptions=True)
+        
+        # Per-batch detail goes to the log only; the console gets one summary line
+        total_pushed = 0
+        failed = 0
+        for number, (batch, status_code) in enumerate(zip(batches, results), start=1):
+            if status_code == 200:
+                total_pushed += len(batch)
+                logger.info("Pushed batch %d", number)
+            else:
+                failed += 1
+                logger.error("Error pushing batch %d: %s", number, status_code)
+        
+        if failed:
+            print(f"   ✗ {failed}/{len(batches)} batches failed")
+        return total_pushed
+
+    def _post_airtable_batch(self, batch):
+        """POST one batch of records, retrying rate limits and server errors.
+        Returns the final status code."""
+        # typecast lets Airtable coerce values (e.g. new Status options) instead of rejecting the batch
+        body, _ = self._encode_payload({'records': batch, 'typecast': True}, compress=self.airtable_accepts_gzip)
+        
+        for attempt in range(1, 4):
+            self._airtable_bucket.acquire()
+            response = self.http.post(self.airtable_api_url, data=body, headers=self._airtable_post_headers, timeout=60)
+            # Retry rate limiting and server errors; anything else won't improve
+            if (response.status_code != 429 and response.status_code < 500) or attempt == 3:
+                break
+            # Airtable asks clients to back off for 30 seconds after a 429
+            if response.status_code == 429:
+                wait = _retry_after(response, 30)
+            else:
+                wait = _backoff(attempt, base=2)
+            logger.warning(f"Airtable returned {response.status_code}, retrying in {wait:.1f}s")
+            time.sleep(wait)
+        return response.status_code
+
     def send_to_n8n_webhook(self, new_candidates):
-        """Send to n8n webhook"""
+        """Queue the run summary for the n8n webhook"""
         if not self.n8n_webhook_url:
             return
             
+        print("\n→ Sending to n8n...")
+        logger.info("Sending to n8n webhook")
+        
+        payload = {
+            'timestamp': datetime.now().isoformat(),
+            'job_id': self.job_id,
+            'total_scraped': len(self.candidates),
+            'new_candidates_count': len(new_candidates),
+            'new_candidates': new_candidates,
+            'status': 'success'
+        }
+        self._schedule_webhook(payload, f"{len(new_candidates)} candidates")
+
+    def _schedule_webhook(self, payload, description):
+        """Post to n8n in the background; pending posts are drained before close()"""
+        task = asyncio.create_task(self._post_webhook_async(payload, description))
+        self._pending_webhooks.add(task)
+        task.add_done_callback(self._pending_webhooks.discard)
+
+    async def _post_webhook_async(self, payload, description):
+        async with self._webhook_slots:
+            await asyncio.to_thread(self._post_webhook, payload, description)
+
+    def _post_webhook(self, payload, description):
         try:
-            print("\n→ Sending to n8n...")
-            logger.info("Sending to n8n webhook")
-            
-            payload = {
-                'timestamp': datetime.now().isoformat(),
-                'job_id': self.job_id,
-                'total_scraped': len(self.candidates),
-                'new_candidates_count': len(new_candidates),
-                'new_candidates': new_candidates,
-                'status': 'success'
-            }
-            
-            response = requests.post(self.n8n_webhook_url, json=payload, timeout=60)
+            body, headers = self._encode_payload(payload, compress=self.n8n_accepts_gzip)
+            # Only retry when n8n can't have run the workflow yet: connection
+            # failures, rate limiting and gateway errors. A 500 means it ran and failed.
+            for attempt in range(1, 4):
+                try:
+                    response = self.http.post(self.n8n_webhook_url, data=body, headers=headers, timeout=60)
+                except requests.ConnectionError as e:
+                    if attempt == 3:
+                        raise
+                    logger.warning(f"Webhook connection failed ({e}), retrying")
+                    time.sleep(_backoff(attempt, base=2))
+                    continue
+                if response.status_code not in (429, 502, 503, 504) or attempt == 3:
+                    break
+                wait = _retry_after(response, _backoff(attempt, base=2))
+                logger.warning(f"Webhook returned {response.status_code}, retrying in {wait:.1f}s")
+                time.sleep(wait)
             
             if response.status_code in [200, 201, 204]:
-                print(f"✓ Sent {len(new_candidates)} to n8n")
-                logger.info(f"✓ Sent {len(new_candidates)} candidates to n8n")
+                print(f"✓ Sent {description} to n8n")
+                logger.info(f"✓ Sent {description} to n8n")
             else:
                 print(f"⚠ Webhook status {response.status_code}")
                 logger.warning(f"Webhook returned status {response.status_code}")
@@ -1075,6 +1460,146 @@ class JobTodayWebhookScraper:
             logger.error(f"n8n webhook error: {e}")
             print(f"✗ n8n error: {e}")
 
+    async def drain_webhooks(self, timeout=60):
+        """Wait for background webhook posts to finish"""
+        if not self._pending_webhooks:
+            return
+        logger.info(f"Waiting for {len(self._pending_webhooks)} pending webhook(s)")
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*self._pending_webhooks, return_exceptions=True),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Pending webhooks did not finish within {timeout}s")
+
+    def open_checkpoint(self):
+        """Start a fresh JSON-Lines checkpoint and CSV for this run, plus the task writing them.
+        The CSV is streamed to a .tmp file and only replaces the previous one when the run completes"""
+        try:
+            self._checkpoint = open(self.checkpoint_file, 'wb')
+            self._csv = open(self.csv_file + '.tmp', 'wb')
+            self._csv.write((','.join(self.csv_columns) + '\r\n').encode('utf-8'))
+            logger.info(f"Checkpointing candidates to {self.checkpoint_file} and {self.csv_file}")
+        except Exception as e:
+            logger.warning(f"Could not open output files: {e}")
+            return
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+    def record_candidate(self, details):
+        """Keep a scraped candidate and queue it for the checkpoint and CSV,
+        unless that profile was already recorded this run"""
+        url = _normalize_url(details.get('profile_url'))
+        if url:
+            if url in self._recorded_urls:
+                logger.info(f"Profile already recorded this run: {url}")
+                return
+            self._recorded_urls.add(url)
+        self.candidates.append(details)
+        if self._write_queue:
+            self._write_queue.put_nowait(details)
+
+    async def _writer_loop(self):
+        """Append queued candidates to the output files off the event loop until None arrives"""
+        while True:
+            details = await self._write_queue.get()
+            if details is None:
+                return
+            try:
+                await asyncio.to_thread(self._write_candidate, details)
+            except Exception as e:
+                logger.warning(f"Could not write checkpoint: {e}")
+
+    def _write_candidate(self, details):
+        row = ','.join(_csv_escape(details.get(k)) for k in self.csv_columns) + '\r\n'
+        self._checkpoint.write(orjson.dumps(details) + b'\n')
+        self._csv.write(row.encode('utf-8'))
+        self._checkpoint.flush()
+        self._csv.flush()
+
+    async def close_checkpoint(self, completed=False):
+        """Let the writer task finish the queued candidates, then close the output files.
+        The CSV is published only for a completed run, so a failed one keeps the last good CSV"""
+        if self._writer_task:
+            self._write_queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+            self._write_queue = None
+        csv_written = self._csv is not None
+        for f in (self._checkpoint, self._csv):
+            if f:
+                f.close()
+        self._checkpoint = self._csv = None
+        if not csv_written:
+            return
+        tmp = self.csv_file + '.tmp'
+        try:
+            if completed:
+                os.replace(tmp, self.csv_file)
+                logger.info(f"Saved to {self.csv_file}")
+            else:
+                os.remove(tmp)
+        except OSError as e:
+            logger.warning(f"Could not {'publish' if completed else 'remove'} {tmp}: {e}")
+
+    def open_scrape_cache(self):
+        """Open the SQLite cache of candidates scraped in earlier runs"""
+        try:
+            self._scrape_cache = sqlite3.connect(self.scrape_cache_file, isolation_level=None)
+            self._scrape_cache.execute('PRAGMA journal_mode=WAL')
+            self._scrape_cache.execute('PRAGMA synchronous=NORMAL')
+            self._scrape_cache.execute(
+                'CREATE TABLE IF NOT EXISTS profiles (profile_url TEXT PRIMARY KEY, details BLOB, scraped_at TEXT)'
+            )
+            self._scrape_cache.execute('DELETE FROM profiles WHERE scraped_at <= ?', (self._scrape_cache_cutoff(),))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open scrape cache: {e}")
+            self._scrape_cache = None
+
+    def _scrape_cache_cutoff(self):
+        """Scrape time before which cached details are considered stale"""
+        return (datetime.now(timezone.utc) - self.scrape_cache_max_age).isoformat()
+
+    def _cached_candidate(self, profile_url):
+        """Details scraped for this profile in a recent run, or None"""
+        url = _normalize_url(profile_url)
+        if not self._scrape_cache or not url:
+            return None
+        try:
+            row = self._scrape_cache.execute(
+                'SELECT details FROM profiles WHERE profile_url = ? AND scraped_at > ?',
+                (url, self._scrape_cache_cutoff())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read scrape cache: {e}")
+            return None
+        return orjson.loads(row[0]) if row else None
+
+    def _cache_candidate(self, details, refresh_age=True):
+        """Store details for their profile URL. Without refresh_age the entry keeps its
+        original scrape time, so profile and phone are still re-scraped once it expires"""
+        url = _normalize_url(details.get('profile_url'))
+        if not self._scrape_cache or not url:
+            return
+        try:
+            if refresh_age:
+                self._scrape_cache.execute(
+                    'INSERT OR REPLACE INTO profiles VALUES (?, ?, ?)',
+                    (url, orjson.dumps(details), datetime.now(timezone.utc).isoformat())
+                )
+            else:
+                self._scrape_cache.execute(
+                    'UPDATE profiles SET details = ? WHERE profile_url = ?', (orjson.dumps(details), url)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write scrape cache: {e}")
+
+    def close_scrape_cache(self):
+        if self._scrape_cache:
+            self._scrape_cache.close()
+            self._scrape_cache = None
+
     async def save_to_json(self, filename='candidates_detailed.json'):
         output = {
             'scraped_at': datetime.now().isoformat(),
@@ -1082,67 +1607,54 @@ class JobTodayWebhookScraper:
             'total_candidates': len(self.candidates),
             'candidates': self.candidates
         }
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=4, ensure_ascii=False)
-        print(f"✓ Saved to {filename}")
-        logger.info(f"Saved to {filename}")
-
-    async def export_to_csv(self, filename='candidates_detailed.csv'):
-        if not self.candidates:
-            return
         try:
-            fieldnames = set()
-            for c in self.candidates:
-                fieldnames.update(c.keys())
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=sorted(list(fieldnames)))
-                writer.writeheader()
-                writer.writerows(self.candidates)
-            print(f"✓ Exported to {filename}")
-            logger.info(f"Exported to {filename}")
+            data = orjson.dumps(output, option=orjson.OPT_INDENT_2)
+            await asyncio.to_thread(self._write_file, filename, data)
+            print(f"✓ Saved to {filename}")
+            logger.info(f"Saved to {filename}")
+            return True
         except Exception as e:
-            logger.error(f"CSV export error: {e}")
-            print(f"✗ CSV error: {e}")
+            logger.error(f"JSON save error: {e}")
+            print(f"✗ JSON error: {e}")
+            return False
 
-    async def close(self):
-        if self.browser:
-            await self.browser.close()
-            logger.info("Browser closed")
-        if self.playwright:
-            await self.playwright.stop()
-            logger.info("Playwright stopped")
-        print("✓ Browser closed")
+    @staticmethod
+    def _write_file(filename, data):
+        """Replace filename with data atomically, so a crash mid-write never leaves it truncated"""
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, filename)
+
+    async def close(self, timeout=10):
+        """Close this run's browser context; the shared browser stays up for reuse"""
+        if self.context:
+            try:
+                await asyncio.wait_for(self.context.close(), timeout=timeout)
+                logger.info("Browser context closed")
+            except asyncio.TimeoutError:
+                logger.warning(f"Browser context close timed out after {timeout}s, forcing")
+            except Exception as e:
+                logger.warning(f"Could not close browser context: {e}")
+            self.context = None
+        print("✓ Browser context closed")
 
     async def run(self, headless=True):
+        # Set once candidates_detailed.json is written, so the CSV is published alongside it
+        completed = False
         try:
             await self.initialize_browser(headless=headless)
+            self.open_checkpoint()
+            self.open_scrape_cache()
             
-            # Load or create session
-            session_loaded = await self.load_session()
-            
-            if not session_loaded:
-                if not await self.login_with_retry(max_attempts=3):
-                    print("✗ Login failed")
-                    logger.error("Login failed after retries")
-                    return
-                await self.save_session()
-            else:
-                print("→ Verifying session...")
-                logger.info("Verifying existing session...")
-                await self.page.goto(self.base_url, wait_until='domcontentloaded', timeout=120000)
-                await asyncio.sleep(3)
-                
-                if '/auth/login' in self.page.url:
-                    print("   Session expired, re-login...")
-                    logger.warning("Session expired, re-authenticating")
-                    if not await self.login_with_retry(max_attempts=3):
-                        print("✗ Re-login failed")
-                        logger.error("Re-login failed")
-                        return
-                    await self.save_session()
-                else:
-                    print("   ✓ Session valid")
-                    logger.info("Session still valid")
+            # Restore the saved session, logging in only if it has expired
+            if not await self.ensure_context():
+                print("✗ Login failed")
+                logger.error("Login failed after retries")
+                return
+
+            # Scan Airtable for existing profiles while the browser does the scraping
+            self._existing_profiles_task = asyncio.create_task(asyncio.to_thread(self.get_existing_profiles))
 
             # Scrape job role
             await self.scrape_job_role()
@@ -1150,33 +1662,30 @@ class JobTodayWebhookScraper:
             logger.info("Ready to start scraping sections...")
             print("\n→ Starting to scrape sections...")
 
-            # Scrape sections
+            # Scrape sections concurrently; their workers share the context slots
             sections = ['recommended', 'incoming']
-            for section in sections:
-                if self.page.is_closed():
-                    logger.error("Page closed unexpectedly")
-                    break
-                
-                logger.info(f"About to scrape section: {section}")
-                await self.scrape_section(section)
+            results = await asyncio.gather(
+                *(self.scrape_section(section) for section in sections), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
 
             if not self.candidates:
                 print("\n✗ No candidates scraped")
                 logger.warning("No candidates were scraped")
                 return
 
-            # Save results
-            logger.info("Saving results...")
-            await self.save_to_json()
-            await self.export_to_csv()
-            
-            # Push to Airtable
-            logger.info("Pushing to Airtable...")
-            new_candidates = self.push_to_airtable()
-            
-            # Send to n8n
-            logger.info("Sending to n8n webhook...")
-            self.send_to_n8n_webhook(new_candidates)
+            # Save results and push to Airtable side by side
+            logger.info("Saving results and pushing to Airtable...")
+            completed, new_candidates = await asyncio.gather(self.save_to_json(), self.push_to_airtable())
+            
+            # Send to n8n only when there's something new to act on
+            if new_candidates:
+                logger.info("Sending to n8n webhook...")
+                self.send_to_n8n_webhook(new_candidates)
+            else:
+                logger.info("No new candidates, skipping n8n webhook")
 
             print("\n" + "="*50)
             print("✓ SCRAPING COMPLETE")
@@ -1193,24 +1702,55 @@ class JobTodayWebhookScraper:
             print(f"\n✗ Fatal error: {e}")
             
             # Send error to n8n
+            # Posted in the background so browser cleanup doesn't wait on it
             if self.n8n_webhook_url:
-                try:
-                    error_payload = {
-                        'timestamp': datetime.now().isoformat(),
-                        'status': 'error',
-                        'error_message': error_msg
-                    }
-                    requests.post(self.n8n_webhook_url, json=error_payload, timeout=20)
-                    logger.info("Error notification sent to n8n")
-                except Exception as webhook_error:
-                    logger.error(f"Could not send error to n8n: {webhook_error}")
+                error_payload = {
+                    'timestamp': datetime.now().isoformat(),
+                    'status': 'error',
+                    'error_message': error_msg
+                }
+                self._schedule_webhook(error_payload, "error notification")
                         
         finally:
-            await self.close()
+            if self._existing_profiles_task and not self._existing_profiles_task.done():
+                # Cancelling the task can't stop its thread, so signal it as well
+                self._stop_profile_scan.set()
+                self._existing_profiles_task.cancel()
+            await self.close_checkpoint(completed)
+            self.close_scrape_cache()
+            await asyncio.gather(self.close(), self.drain_webhooks())
+            # Only after the drain: webhook threads may still be using the pool
+            self.http.close()
+
+async def shutdown_browser(timeout=10):
+    """Close the shared browser and stop Playwright without hanging on stuck CDP sessions"""
+    shared = _BROWSER_SINGLETON
+    browser, pw = shared['browser'], shared['pw']
+    shared.update(pw=None, browser=None, loop=None)
+    if browser:
+        try:
+            await asyncio.wait_for(browser.close(), timeout=timeout)
+            logger.info("Browser closed")
+        except asyncio.TimeoutError:
+            logger.warning(f"Browser close timed out after {timeout}s, forcing")
+    if pw:
+        try:
+            await asyncio.wait_for(pw.stop(), timeout=timeout)
+            logger.info("Playwright stopped")
+        except asyncio.TimeoutError:
+            logger.warning(f"Playwright stop timed out after {timeout}s, forcing")
 
 async def main():
     scraper = JobTodayWebhookScraper()
-    await scraper.run(headless=False)
+    try:
+        await scraper.run(headless=False)
+    finally:
+        await shutdown_browser()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -1,39 +1,128 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 import asyncio
-from threading import Thread
+from threading import Thread, Lock, RLock
 import os
 from datetime import datetime
 import sys
-import json
+import orjson
 import traceback
 import logging
 import time
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-# Set up logging
+# uvloop is Linux/macOS only; fall back to the stdlib loop elsewhere
+try:
+    from uvloop import new_event_loop
+except ImportError:
+    from asyncio import new_event_loop
+
+# Set up logging. Records are handed to a listener thread that writes them,
+# so logging from the scraper loop never blocks on stdout
+_log_queue = queue.SimpleQueue()
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+_log_listener = QueueListener(_log_queue, _stdout_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
+    # The listener's handler adds timestamp and level; only the message is queued
+    format='%(message)s',
     handlers=[
-        logging.StreamHandler(sys.stdout)
+        QueueHandler(_log_queue)
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Imported once at startup rather than on the first trigger. A broken install
+# is reported by the run and /health instead of keeping the API from starting
+try:
+    from jobtoday_1 import JobTodayWebhookScraper, shutdown_browser
+    scraper_import_error = None
+except Exception as e:
+    logger.error(f"Could not import scraper: {e}")
+    JobTodayWebhookScraper = shutdown_browser = None
+    scraper_import_error = e
+
+try:
+    from playwright.sync_api import sync_playwright
+    playwright_installed = True
+except Exception as e:
+    logger.error(f"Playwright check failed: {e}")
+    playwright_installed = False
+
 app = Flask(__name__)
 
 # File-based status (persists across crashes)
 STATUS_FILE = '/app/data/scraper_status.json'
 HEARTBEAT_FILE = '/app/data/scraper_heartbeat.json'
 
-# Global variable to track if scraper is running
-scraper_thread = None
+# Created once here rather than before every status and heartbeat write
+try:
+    os.makedirs('/app/data', exist_ok=True)
+except OSError as e:
+    logger.error(f"Could not create data directory: {e}")
+
+# Future of the current run on the scraper loop, if any
+scraper_future = None
+_trigger_lock = Lock()
+
+# One event loop shared by every run, so the browser the first run launches
+# stays up for the next instead of being relaunched per trigger
+_scraper_loop = None
+_scraper_loop_lock = Lock()
+
+def get_scraper_loop():
+    """Return the background event loop scraper runs execute on, starting it on first use"""
+    global _scraper_loop
+    with _scraper_loop_lock:
+        if _scraper_loop is None:
+            _scraper_loop = new_event_loop()
+            Thread(target=_scraper_loop.run_forever, name='scraper-loop', daemon=True).start()
+    return _scraper_loop
+
+def shutdown_scraper_loop():
+    """Close the shared browser and stop the scraper loop when the process exits"""
+    if _scraper_loop is None:
+        return
+    if scraper_future and not scraper_future.done():
+        # Like the old non-daemon run thread, let an in-progress run finish first
+        logger.info("Waiting for the running scrape to finish...")
+        try:
+            scraper_future.result()
+        except Exception:
+            pass
+    if shutdown_browser:
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown_browser(), _scraper_loop).result(timeout=15)
+        except Exception as e:
+            logger.error(f"Error shutting down browser: {e}")
+    _scraper_loop.call_soon_threadsafe(_scraper_loop.stop)
+
+atexit.register(shutdown_scraper_loop)
+
+# Parsed status file and its raw bytes, only re-read when its mtime changes
+_status_cache = None
+_status_raw = None
+_status_mtime = None
+_status_lock = RLock()
 
 def load_status():
-    """Load status from file"""
+    """Load status from file, reusing the parsed copy while the file is unchanged"""
+    global _status_cache, _status_raw, _status_mtime
     try:
-        if os.path.exists(STATUS_FILE):
-            with open(STATUS_FILE, 'r') as f:
-                return json.load(f)
+        with _status_lock:
+            mtime = os.stat(STATUS_FILE).st_mtime_ns
+            if mtime != _status_mtime:
+                with open(STATUS_FILE, 'rb') as f:
+                    _status_raw = f.read()
+                _status_cache = orjson.loads(_status_raw)
+                _status_mtime = mtime
+            return _status_cache
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.error(f"Error loading status: {e}")
     return {
@@ -44,10 +133,19 @@ def load_status():
 
 def save_status(status_data):
     """Save status to file"""
+    global _status_cache, _status_raw, _status_mtime
     try:
-        os.makedirs('/app/data', exist_ok=True)
-        with open(STATUS_FILE, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        with _status_lock:
+            # Written aside and renamed in, so a reader never parses a half-written file
+            raw = orjson.dumps(status_data)
+            tmp = STATUS_FILE + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp, STATUS_FILE)
+            # What was just written is what the next load would parse
+            _status_cache = status_data
+            _status_raw = raw
+            _status_mtime = os.stat(STATUS_FILE).st_mtime_ns
         logger.info(f"Status saved: {status_data['status']}")
     except Exception as e:
         logger.error(f"Could not save status: {e}")
@@ -55,26 +153,30 @@ def save_status(status_data):
 def update_heartbeat():
     """Update heartbeat file to show scraper is alive"""
     try:
-        os.makedirs('/app/data', exist_ok=True)
+        now = time.time()
         heartbeat_data = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+            # Epoch seconds, so liveness is a subtraction rather than a date parse
+            'epoch': now,
             'status': 'alive'
         }
-        with open(HEARTBEAT_FILE, 'w') as f:
-            json.dump(heartbeat_data, f)
+        tmp = HEARTBEAT_FILE + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps(heartbeat_data))
+        os.replace(tmp, HEARTBEAT_FILE)
     except Exception as e:
         logger.error(f"Could not update heartbeat: {e}")
 
 def get_heartbeat():
-    """Get last heartbeat timestamp"""
+    """Get last heartbeat as (ISO timestamp, epoch seconds)"""
     try:
         if os.path.exists(HEARTBEAT_FILE):
-            with open(HEARTBEAT_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get('timestamp')
+            with open(HEARTBEAT_FILE, 'rb') as f:
+                data = orjson.loads(f.read())
+                return data.get('timestamp'), data.get('epoch')
     except:
         pass
-    return None
+    return None, None
 
 # Load initial status
 last_run_status = load_status()
@@ -102,7 +204,6 @@ class ScraperProgress:
         # Update heartbeat every 10 seconds
         current_time = time.time()
         if current_time - self.last_update > 10:
-            update_heartbeat()
             self.last_update = current_time
             
             # Also update status with progress
@@ -114,13 +215,38 @@ class ScraperProgress:
                 'processed': self.processed_count,
                 'total': self.total_candidates
             }
+            try:
+                _progress_writes.put_nowait(status_update)
+            except queue.Full:
+                # The writer hasn't caught up; this newer snapshot replaces the queued one
+                try:
+                    _progress_writes.get_nowait()
+                except queue.Empty:
+                    pass
+                _progress_writes.put_nowait(status_update)
+            logger.info("Progress: %d/%d candidates", self.processed_count, self.total_candidates)
+
+# Progress snapshots waiting for the writer thread. Only the newest is kept,
+# so the scraper loop never waits on the heartbeat and status files
+_progress_writes = queue.Queue(maxsize=1)
+
+def _progress_writer():
+    """Write queued progress snapshots to the heartbeat and status files"""
+    while True:
+        status_update = _progress_writes.get()
+        update_heartbeat()
+        with _status_lock:
+            # A run that already finished must not be overwritten by its last progress
+            if _status_cache is not None and _status_cache.get('status') != 'running':
+                continue
             save_status(status_update)
-            logger.info(f"Progress: {self.processed_count}/{self.total_candidates} candidates")
+
+Thread(target=_progress_writer, name='progress-writer', daemon=True).start()
 
 progress_tracker = ScraperProgress()
 
-def run_scraper_async():
-    """Run the scraper in a separate thread with its own event loop"""
+async def run_scraper_async():
+    """Run the scraper on the shared scraper loop and record the outcome"""
     global last_run_status, progress_tracker
     
     # Update to running status
@@ -144,12 +270,8 @@ def run_scraper_async():
         logger.info("🚀 SCRAPER STARTING")
         logger.info("=" * 60)
         
-        # Import here to avoid issues with async imports at module level
-        from jobtoday_1 import JobTodayWebhookScraper
-        
-        # Create a new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        if scraper_import_error:
+            raise scraper_import_error
         
         try:
             logger.info("Initializing scraper...")
@@ -159,7 +281,7 @@ def run_scraper_async():
             scraper.progress_tracker = progress_tracker
             
             logger.info("Starting scraper.run()...")
-            loop.run_until_complete(scraper.run(headless=True))
+            await scraper.run(headless=True)
             
             candidates_count = len(scraper.candidates) if hasattr(scraper, 'candidates') else 0
             
@@ -200,12 +322,6 @@ def run_scraper_async():
             }
             save_status(last_run_status)
             
-        finally:
-            try:
-                loop.close()
-            except Exception as e:
-                logger.error(f"Error closing event loop: {e}")
-            
     except Exception as e:
         error_msg = str(e)
         error_trace = traceback.format_exc()
@@ -230,6 +346,26 @@ def run_scraper_async():
     logger.info(f"🏁 SCRAPER FINISHED - Status: {last_run_status['status']}")
     logger.info("=" * 60)
 
+# Constant parts of the / and /health responses, serialized once; each request
+# only encodes the changing field and closes the object
+_HOME_PREFIX = orjson.dumps({
+    "service": "JobToday Scraper API",
+    "status": "operational",
+    "endpoints": {
+        "/trigger-scrape": "POST - Trigger the scraper",
+        "/status": "GET - Get scraper status",
+        "/health": "GET - Health check",
+        "/logs": "GET - Get recent logs (if available)",
+        "/heartbeat": "GET - Get scraper heartbeat"
+    }
+})[:-1]
+_HEALTH_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "service": "JobToday Scraper API",
+    "python_version": sys.version,
+    "playwright_installed": playwright_installed
+})[:-1]
+
 @app.route('/', methods=['GET', 'HEAD'])
 def home():
     """Home endpoint"""
@@ -240,46 +376,37 @@ def home():
     global last_run_status
     last_run_status = load_status()
     
-    return jsonify({
-        "service": "JobToday Scraper API",
-        "status": "operational",
-        "endpoints": {
-            "/trigger-scrape": "POST - Trigger the scraper",
-            "/status": "GET - Get scraper status",
-            "/health": "GET - Health check",
-            "/logs": "GET - Get recent logs (if available)",
-            "/heartbeat": "GET - Get scraper heartbeat"
-        },
-        "current_status": last_run_status
-    }), 200
+    body = _HOME_PREFIX + b',"current_status":' + orjson.dumps(last_run_status) + b'}'
+    return Response(body, mimetype='application/json'), 200
 
 @app.route('/trigger-scrape', methods=['POST'])
 def trigger_scrape():
     """Endpoint for n8n to trigger scraping"""
-    global last_run_status, scraper_thread
-    last_run_status = load_status()
+    global last_run_status, scraper_future
     
     logger.info("🔔 Scrape triggered via API")
     
-    # Check if already running
-    if last_run_status.get("status") == "running":
-        # Check if thread is actually alive
-        if scraper_thread and scraper_thread.is_alive():
+    with _trigger_lock:
+        # Check if already running. The run's future is the in-memory source of
+        # truth, so rejecting a repeat trigger needs no status file read
+        if scraper_future and not scraper_future.done():
             logger.warning("Scraper already running, rejecting new request")
+            current = _status_cache or last_run_status
             return jsonify({
                 "status": "already_running",
                 "message": "Scraper is already running",
-                "started_at": last_run_status.get("start_time"),
-                "progress": last_run_status.get("progress")
+                "started_at": current.get("start_time"),
+                "progress": current.get("progress")
             }), 429
-        else:
-            # Thread died but status wasn't updated
-            logger.warning("Scraper thread died without updating status, allowing new run")
-    
-    # Run scraper in background thread
-    logger.info("Starting scraper in background thread...")
-    scraper_thread = Thread(target=run_scraper_async, daemon=False)
-    scraper_thread.start()
+        
+        last_run_status = load_status()
+        if last_run_status.get("status") == "running":
+            # Run died but status wasn't updated
+            logger.warning("Scraper run ended without updating status, allowing new run")
+        
+        # Run scraper on the background loop
+        logger.info("Starting scraper on the background loop...")
+        scraper_future = asyncio.run_coroutine_threadsafe(run_scraper_async(), get_scraper_loop())
     
     return jsonify({
         "status": "started",
@@ -293,23 +420,30 @@ def trigger_scrape():
 def status():
     """Get current scraper status"""
     global last_run_status
-    last_run_status = load_status()
-    return jsonify(last_run_status), 200
+    with _status_lock:
+        last_run_status = load_status()
+        # The status file already holds the exact response, so send its bytes as they are
+        body = _status_raw if last_run_status is _status_cache else orjson.dumps(last_run_status)
+    return Response(body, mimetype='application/json'), 200
 
 @app.route('/heartbeat', methods=['GET'])
 def heartbeat():
     """Get scraper heartbeat - shows if scraper is alive"""
-    last_heartbeat = get_heartbeat()
+    last_heartbeat, heartbeat_epoch = get_heartbeat()
     is_alive = False
     seconds_since_heartbeat = None
     
-    if last_heartbeat:
+    if heartbeat_epoch is not None:
+        seconds_since_heartbeat = time.time() - heartbeat_epoch
+    elif last_heartbeat:
+        # Heartbeats written before the epoch field was added
         try:
             heartbeat_time = datetime.fromisoformat(last_heartbeat)
             seconds_since_heartbeat = (datetime.now() - heartbeat_time).total_seconds()
-            is_alive = seconds_since_heartbeat < 30  # Consider alive if heartbeat within 30 seconds
         except:
             pass
+    if seconds_since_heartbeat is not None:
+        is_alive = seconds_since_heartbeat < 30  # Consider alive if heartbeat within 30 seconds
     
     return jsonify({
         "last_heartbeat": last_heartbeat,
@@ -321,13 +455,8 @@ def heartbeat():
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint - always responds quickly"""
-    return jsonify({
-        "status": "healthy",
-        "service": "JobToday Scraper API",
-        "python_version": sys.version,
-        "timestamp": datetime.now().isoformat(),
-        "playwright_installed": check_playwright()
-    }), 200
+    body = _HEALTH_PREFIX + b',"timestamp":' + orjson.dumps(datetime.now().isoformat()) + b'}'
+    return Response(body, mimetype='application/json'), 200
 
 @app.route('/logs', methods=['GET'])
 def logs():
@@ -344,15 +473,6 @@ def logs():
         "progress": last_run_status.get("progress")
     }), 200
 
-def check_playwright():
-    """Check if Playwright is properly installed"""
-    try:
-        from playwright.sync_api import sync_playwright
-        return True
-    except Exception as e:
-        logger.error(f"Playwright check failed: {e}")
-        return False
-
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     logger.info(f"Starting Flask app on port {port}")